@@ -3,11 +3,148 @@ NSE API Wrapper
 Custom NSE data fetcher using direct NSE API endpoints.
 """
 
+import asyncio
+import aiohttp
+import orjson
 import requests
-from time import sleep
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import threading
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from concurrent.futures import Future, ThreadPoolExecutor
+from time import monotonic, sleep, time
+import functools
+import logging
+import mmap
 import os
-from datetime import datetime, timedelta
-import csv
+import pickle
+import random
+import shutil
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+
+logger = logging.getLogger(__name__)
+
+NSE_HOME_URL = "https://www.nseindia.com"
+OPTION_CHAIN_URL = "https://www.nseindia.com/option-chain"
+DERIVATIVES_URL = "https://www.nseindia.com/api/NextApi/apiClient/GetQuoteApi?functionName=getSymbolDerivativesData&symbol={symbol}"
+
+# Statuses worth retrying when NSE throttles or has a transient failure
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+# Derivatives responses are reused for this many seconds, so price and options
+# lookups for the same symbol during one scan share a single request. Kept
+# below the app's 30s auto-refresh so every refresh gets fresh premiums
+DERIVATIVES_CACHE_TTL = 25
+DERIVATIVES_CACHE_SIZE = 512
+
+# Lot size cache files older than this many seconds are ignored and removed
+LOT_SIZES_MAX_AGE = 7 * 24 * 60 * 60
+
+# Keep-alive connections held open per host by the requests session
+POOL_SIZE = 32
+
+# (connect, read) timeouts in seconds for NSE API requests
+REQUEST_TIMEOUT = (5, 15)
+
+# Caps NSE requests in flight across all threads and batch fetches; NSE
+# throttles parallel clients and starts returning malformed responses under load
+NSE_MAX_PARALLEL = int(os.getenv('NSE_MAX_PARALLEL', '4'))
+_NSE_GATE = threading.Semaphore(NSE_MAX_PARALLEL)
+
+# Month tokens used in NSE expiry dates (e.g., '30-Dec-2025')
+_MONTHS = frozenset(['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'])
+
+# Columns of the options table returned by get_options_data
+OPTION_COLUMNS = [
+    'symbol', 'expiry_date', 'expiry_month', 'option_type', 'strike',
+    'last_price', 'volume', 'open_interest', 'underlying_value'
+]
+
+# Fixed dtypes so an empty chain (e.g. a month with no listed contracts) has
+# the same schema as a populated one
+OPTION_DTYPES = {
+    'symbol': 'str', 'expiry_date': 'str', 'expiry_month': 'str', 'option_type': 'str',
+    'strike': 'float64', 'last_price': 'float64'
+}
+
+
+def _check_expiry_month(expiry_month):
+    """Raise ValueError for an expiry month filter NSE never uses"""
+    if expiry_month and expiry_month not in _MONTHS:
+        raise ValueError(
+            f"Invalid expiry month '{expiry_month}'. "
+            f"Expected a three-letter month abbreviation such as 'Jan' or 'Dec'."
+        )
+
+
+@asynccontextmanager
+async def _nse_gate_async():
+    """Hold _NSE_GATE from async code without blocking the event loop"""
+    await asyncio.to_thread(_NSE_GATE.acquire)
+    try:
+        yield
+    finally:
+        _NSE_GATE.release()
+
+
+def retry(tries=4, delay=0.5, backoff=2, jitter=(0, 0.3), exceptions=(Exception,)):
+    """
+    Retry the decorated function with exponential backoff and random jitter.
+    
+    Args:
+        tries (int): Total attempts before the last exception is re-raised
+        delay (float): Seconds to wait before the first retry
+        backoff (float): Multiplier applied to the delay after each retry
+        jitter (tuple): (min, max) random seconds added to every wait
+        exceptions (tuple): Exception types that trigger a retry
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            wait = delay
+            for attempt in range(1, tries + 1):
+                try:
+                    return func(*args, **kwargs)
+                except exceptions as e:
+                    if attempt == tries:
+                        raise
+                    pause = wait + random.uniform(*jitter)
+                    logger.info("%s failed (%s), retrying in %.2fs", func.__name__, e, pause)
+                    sleep(pause)
+                    wait *= backoff
+        return wrapper
+    return decorator
+
+
+def build_session(pool_size=POOL_SIZE):
+    """
+    Create a requests session that keeps connections alive and retries
+    throttled or failed requests with backoff.
+    
+    Args:
+        pool_size (int): Keep-alive connections held open per host
+        
+    Returns:
+        requests.Session: Session with a pooled HTTPAdapter mounted
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=sorted(RETRY_STATUSES),
+            raise_on_status=False  # Hand the last response back so its status gets reported
+        )
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
 
 
 class NSEDataFetcher:
@@ -16,29 +153,54 @@ class NSEDataFetcher:
     Provides live stock prices and options data.
     """
     
-    def __init__(self):
-        self.session = requests.Session()
+    def __init__(self, session=None):
+        """
+        Args:
+            session (requests.Session, optional): Session to send requests on.
+                Defaults to a new pooled session from build_session().
+        """
+        self.session = session if session is not None else build_session()
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': '*/*',
+            'Accept-Encoding': 'gzip, deflate',
             'Accept-Language': 'en-US,en;q=0.9',
             'Referer': 'https://www.nseindia.com/'
         }
         self.cache_dir = os.path.join(os.path.dirname(__file__), 'cache')
+        self._deriv_cache = OrderedDict()  # {symbol: (fetched_at, data)}
+        self._deriv_cache_lock = threading.Lock()
+        self._inflight = {}  # {symbol: Future} for requests in progress
+        self._inflight_lock = threading.Lock()
         self._initialize_session()
         self.lot_sizes = self._load_lot_sizes()
     
     def _initialize_session(self):
         """Get cookies from NSE homepage"""
         try:
-            self.session.get("https://www.nseindia.com", headers=self.headers, timeout=10)
-            sleep(0.3)  # Be respectful to the server
+            with _NSE_GATE:
+                self.session.get(NSE_HOME_URL, headers=self.headers, timeout=10)
+        except Exception as e:
+            logger.warning("Could not initialize session: %s", e)
+    
+    def warm_up(self):
+        """
+        Visit the option chain page so its cookies are set before the first
+        API request. The homepage is already visited on construction; long-lived
+        callers (e.g. a web server) call this once up front so the first
+        symbol fetched does not pay for the cookie round trips.
+        """
+        try:
+            with _NSE_GATE:
+                self.session.get(OPTION_CHAIN_URL, headers=self.headers, timeout=REQUEST_TIMEOUT)
         except Exception as e:
-            print(f"Warning: Could not initialize session: {e}")
+            logger.warning("Could not warm up session: %s", e)
     
     def get_derivatives_data(self, symbol):
         """
         Fetch derivatives data for a symbol.
+        Responses are cached in memory for DERIVATIVES_CACHE_TTL seconds, and
+        concurrent calls for the same symbol share a single request.
         
         Args:
             symbol (str): Stock symbol (e.g., 'PNB', 'SBIN')
@@ -46,20 +208,193 @@ class NSEDataFetcher:
         Returns:
             dict: Raw API response containing all derivatives data
         """
-        url = f"https://www.nseindia.com/api/NextApi/apiClient/GetQuoteApi?functionName=getSymbolDerivativesData&symbol={symbol}"
+        cached = self._get_cached(symbol)
+        if cached is not None:
+            return cached
         
+        # Coalesce concurrent requests for the same symbol: the first caller
+        # fetches, later callers wait for its result
+        with self._inflight_lock:
+            future = self._inflight.get(symbol)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._inflight[symbol] = future
+        
+        if not is_leader:
+            return future.result()
+        
+        data = None
         try:
-            response = self.session.get(url, headers=self.headers, timeout=10)
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                print(f"Error fetching data for {symbol}: Status {response.status_code}")
-                return None
-                
+            data = self._fetch_derivatives(symbol)
+            if data is not None:
+                self._set_cached(symbol, data)
         except Exception as e:
-            print(f"Exception fetching data for {symbol}: {e}")
+            logger.warning("Exception fetching data for %s: %s", symbol, e)
+        finally:
+            with self._inflight_lock:
+                del self._inflight[symbol]
+            future.set_result(data)
+        
+        return data
+    
+    @retry(exceptions=(ValueError,))
+    def _fetch_derivatives(self, symbol):
+        """
+        Request derivatives data for a symbol from NSE.
+        Malformed JSON (e.g. an empty or HTML body from a throttled request)
+        raises ValueError, so the retry decorator tries again. Network errors
+        and 429/5xx statuses are already retried by the session's adapter.
+        """
+        url = DERIVATIVES_URL.format(symbol=symbol)
+        
+        with _NSE_GATE:
+            response = self.session.get(url, headers=self.headers, timeout=REQUEST_TIMEOUT)
+        
+        if response.status_code != 200:
+            logger.warning("Error fetching data for %s: Status %s", symbol, response.status_code)
             return None
+        
+        return orjson.loads(response.content)
+    
+    def get_derivatives_data_many(self, symbols, max_concurrency=NSE_MAX_PARALLEL):
+        """
+        Fetch derivatives data for many symbols concurrently.
+        Safe to call from inside a running event loop (e.g. Jupyter), where
+        the batch runs on a worker thread; async code can await
+        get_derivatives_data_many_async directly instead.
+        
+        Args:
+            symbols (list): Stock symbols (e.g., ['PNB', 'SBIN'])
+            max_concurrency (int): Maximum number of requests in flight,
+                capped at NSE_MAX_PARALLEL
+            
+        Returns:
+            dict: {symbol: raw API response, or None if the fetch failed}
+        """
+        coro = self.get_derivatives_data_many_async(symbols, max_concurrency)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coro)
+        
+        # asyncio.run cannot nest inside a running loop, so use a fresh one
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, coro).result()
+    
+    async def get_derivatives_data_many_async(self, symbols, max_concurrency=NSE_MAX_PARALLEL):
+        """
+        Async version of get_derivatives_data_many.
+        Shares in-flight requests with get_derivatives_data, so a symbol that
+        another caller is already fetching is not requested twice.
+        
+        Args:
+            symbols (list): Stock symbols (e.g., ['PNB', 'SBIN'])
+            max_concurrency (int): Maximum number of requests in flight,
+                capped at NSE_MAX_PARALLEL
+            
+        Returns:
+            dict: {symbol: raw API response, or None if the fetch failed}
+        """
+        symbols = list(dict.fromkeys(symbols))
+        results = {}
+        leading = {}  # {symbol: Future} fetched by this batch
+        waiting = {}  # {symbol: Future} already being fetched by another caller
+        
+        for symbol in symbols:
+            cached = self._get_cached(symbol)
+            if cached is not None:
+                results[symbol] = cached
+                continue
+            
+            with self._inflight_lock:
+                future = self._inflight.get(symbol)
+                if future is None:
+                    leading[symbol] = self._inflight[symbol] = Future()
+                else:
+                    waiting[symbol] = future
+        
+        if leading:
+            fetched = {}
+            try:
+                fetched = await self._fetch_many(list(leading), min(max_concurrency, NSE_MAX_PARALLEL))
+            finally:
+                for symbol, future in leading.items():
+                    data = fetched.get(symbol)
+                    if data is not None:
+                        self._set_cached(symbol, data)
+                    with self._inflight_lock:
+                        del self._inflight[symbol]
+                    future.set_result(data)
+                    results[symbol] = data
+        
+        for symbol, future in waiting.items():
+            results[symbol] = await asyncio.wrap_future(future)
+        
+        return {symbol: results[symbol] for symbol in symbols}
+    
+    def _get_cached(self, symbol):
+        """Return cached derivatives data for a symbol, or None if missing or stale"""
+        with self._deriv_cache_lock:
+            entry = self._deriv_cache.get(symbol)
+            if entry is None:
+                return None
+            
+            fetched_at, data = entry
+            if monotonic() - fetched_at >= DERIVATIVES_CACHE_TTL:
+                del self._deriv_cache[symbol]
+                return None
+            
+            self._deriv_cache.move_to_end(symbol)
+            return data
+    
+    def _set_cached(self, symbol, data):
+        """Cache derivatives data for a symbol, evicting the least recently used"""
+        with self._deriv_cache_lock:
+            self._deriv_cache[symbol] = (monotonic(), data)
+            self._deriv_cache.move_to_end(symbol)
+            while len(self._deriv_cache) > DERIVATIVES_CACHE_SIZE:
+                self._deriv_cache.popitem(last=False)
+    
+    async def _fetch_many(self, symbols, max_concurrency):
+        """Dispatch one request per symbol over a shared aiohttp session"""
+        sem = asyncio.Semaphore(max_concurrency)
+        connector = aiohttp.TCPConnector(limit_per_host=max_concurrency)
+        timeout = aiohttp.ClientTimeout(total=10)
+        
+        async with aiohttp.ClientSession(headers=self.headers, connector=connector, timeout=timeout) as session:
+            # Reuse the cookies already obtained by the requests session
+            session.cookie_jar.update_cookies({c.name: c.value for c in self.session.cookies})
+            try:
+                async with _nse_gate_async(), session.get(NSE_HOME_URL) as response:
+                    await response.read()
+            except Exception as e:
+                logger.warning("Could not initialize async session: %s", e)
+            
+            results = await asyncio.gather(*[self._fetch(session, sem, symbol) for symbol in symbols])
+        
+        return dict(zip(symbols, results))
+    
+    async def _fetch(self, session, sem, symbol, retries=3):
+        """Fetch derivatives data for one symbol, backing off on 429/5xx"""
+        url = DERIVATIVES_URL.format(symbol=symbol)
+        
+        for attempt in range(retries + 1):
+            try:
+                async with sem, _nse_gate_async(), session.get(url) as response:
+                    if response.status == 200:
+                        return orjson.loads(await response.read())
+                    status = response.status
+            except Exception as e:
+                logger.warning("Exception fetching data for %s: %s", symbol, e)
+                return None
+            
+            if status not in RETRY_STATUSES or attempt == retries:
+                logger.warning("Error fetching data for %s: Status %s", symbol, status)
+                return None
+            
+            # Exponential backoff: 0.5s, 1s, 2s, ...
+            await asyncio.sleep(0.5 * 2 ** attempt)
     
     def get_stock_price(self, symbol):
         """
@@ -71,12 +406,7 @@ class NSEDataFetcher:
         Returns:
             float: Current stock price (underlyingValue)
         """
-        data = self.get_derivatives_data(symbol)
-        
-        if data and 'data' in data and len(data['data']) > 0:
-            # underlyingValue is the same across all records
-            return data['data'][0].get('underlyingValue', 0)
-        return 0
+        return self._parse_price(self.get_derivatives_data(symbol))
     
     def get_options_data(self, symbol, expiry_month=None):
         """
@@ -87,45 +417,131 @@ class NSEDataFetcher:
             expiry_month (str, optional): Filter by expiry month (e.g., 'Jan', 'Feb')
             
         Returns:
-            list: List of dictionaries containing options data
+            pd.DataFrame: One row per option, with the columns in OPTION_COLUMNS
+            
+        Raises:
+            ValueError: If expiry_month is not a month abbreviation
         """
-        data = self.get_derivatives_data(symbol)
+        _check_expiry_month(expiry_month)
+        return self._parse_options(self.get_derivatives_data(symbol), symbol, expiry_month)
+    
+    def get_options_by_month(self, symbol):
+        """
+        Get options data for a symbol split by expiry month, in one pass.
         
+        Args:
+            symbol (str): Stock symbol
+            
+        Returns:
+            dict: {expiry_month: options DataFrame as returned by get_options_data}
+        """
+        options = self.get_options_data(symbol)
+        return {
+            month: group.reset_index(drop=True)
+            for month, group in options.groupby('expiry_month', sort=False)
+        }
+    
+    def get_symbol_snapshot(self, symbol, expiry_month=None):
+        """
+        Get the current stock price and options data from a single fetch.
+        Prefer this over separate get_stock_price/get_options_data calls
+        when both are needed.
+        
+        Args:
+            symbol (str): Stock symbol
+            expiry_month (str, optional): Filter by expiry month (e.g., 'Jan', 'Feb')
+            
+        Returns:
+            tuple: (price, options) as returned by get_stock_price and get_options_data
+            
+        Raises:
+            ValueError: If expiry_month is not a month abbreviation
+        """
+        _check_expiry_month(expiry_month)
+        data = self.get_derivatives_data(symbol)
+        return self._parse_price(data), self._parse_options(data, symbol, expiry_month)
+    
+    def _parse_price(self, data):
+        """Extract the current stock price from a derivatives response"""
+        if data and 'data' in data and len(data['data']) > 0:
+            # underlyingValue is the same across all records
+            return data['data'][0].get('underlyingValue', 0)
+        return 0
+    
+    def _parse_options(self, data, symbol, expiry_month=None):
+        """Build the options table for a symbol from a derivatives response"""
         if not data or 'data' not in data:
-            return []
+            return pd.DataFrame(columns=OPTION_COLUMNS).astype(OPTION_DTYPES)
         
-        options = []
+        # Filter for options only (OPTSTK = Stock Options)
+        items = [item for item in data['data'] if item.get('instrumentType') == 'OPTSTK']
         
-        for item in data['data']:
-            # Filter for options only (OPTSTK = Stock Options)
-            if item.get('instrumentType') == 'OPTSTK':
-                option_type = item.get('optionType')  # 'CE' for Call, 'PE' for Put
-                expiry_date = item.get('expiryDate', '')
-                
-                # Extract month from expiry date (format: '30-Dec-2025')
-                month = expiry_date.split('-')[1] if '-' in expiry_date else ''
-                
-                # Filter by expiry month if specified
-                if expiry_month and month != expiry_month:
-                    continue
-                
-                # Extract strike price (format: '     120.00' with spaces)
-                strike_str = item.get('strikePrice', '0').strip()
-                strike = float(strike_str) if strike_str else 0
-                
-                options.append({
-                    'symbol': symbol,
-                    'expiry_date': expiry_date,
-                    'expiry_month': month,
-                    'option_type': option_type,  # 'CE' or 'PE'
-                    'strike': strike,
-                    'last_price': item.get('lastPrice', 0),
-                    'volume': item.get('totalTradedVolume', 0),
-                    'open_interest': item.get('openInterest', 0),
-                    'underlying_value': item.get('underlyingValue', 0)
-                })
-        
-        return options
+        # Filter by expiry month if specified. expiryDate is formatted as
+        # '30-Dec-2025', so the month always sits at [3:6]
+        if expiry_month:
+            items = [item for item in items if item.get('expiryDate', '')[3:6] == expiry_month]
+        
+        # Build the table column by column rather than as one dict per option
+        expiry_dates = []
+        months = []
+        option_types = []
+        strike_strs = []
+        last_prices = []
+        volumes = []
+        open_interests = []
+        underlying_values = []
+        
+        for item in items:
+            get = item.get
+            expiry_date = get('expiryDate', '')
+            
+            expiry_dates.append(expiry_date)
+            months.append(expiry_date[3:6] if len(expiry_date) >= 6 else '')
+            option_types.append(get('optionType'))  # 'CE' for Call, 'PE' for Put
+            strike_strs.append(get('strikePrice', '0'))
+            last_prices.append(get('lastPrice', 0))
+            volumes.append(get('totalTradedVolume', 0))
+            open_interests.append(get('openInterest', 0))
+            underlying_values.append(get('underlyingValue', 0))
+        
+        # Convert strike prices (format: '     120.00' with spaces) in one batch
+        strikes = np.char.strip(np.asarray(strike_strs, dtype=str))
+        strikes[strikes == ''] = '0'
+        strikes = strikes.astype(np.float64)
+        
+        return pd.DataFrame({
+            'symbol': [symbol] * len(strikes),
+            'expiry_date': expiry_dates,
+            'expiry_month': months,
+            'option_type': option_types,
+            'strike': strikes,
+            'last_price': np.asarray(last_prices, dtype=np.float64),
+            'volume': volumes,
+            'open_interest': open_interests,
+            'underlying_value': np.asarray(underlying_values, dtype=np.float64)
+        }, columns=OPTION_COLUMNS).astype(OPTION_DTYPES)
+    
+    def get_options_data_many(self, symbols, expiry_month=None, max_workers=16):
+        """
+        Get options data for several symbols in parallel threads.
+        
+        Args:
+            symbols (list): Stock symbols
+            expiry_month (str, optional): Filter by expiry month (e.g., 'Jan', 'Feb')
+            max_workers (int): Number of symbols fetched at once
+            
+        Returns:
+            dict: {symbol: options DataFrame as returned by get_options_data}
+            
+        Raises:
+            ValueError: If expiry_month is not a month abbreviation
+        """
+        _check_expiry_month(expiry_month)
+        symbols = list(dict.fromkeys(symbols))
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(lambda symbol: self.get_options_data(symbol, expiry_month), symbols)
+            return dict(zip(symbols, results))
     
     def _download_lot_sizes(self):
         """
@@ -143,26 +559,34 @@ class NSEDataFetcher:
         # Generate filename with today's date
         today = datetime.now().strftime('%Y-%m-%d')
         cache_file = os.path.join(self.cache_dir, f'fo_mktlots_{today}.csv')
+        tmp_file = cache_file + '.tmp'
         
         try:
-            print(f"Downloading lot sizes from NSE...")
-            response = self.session.get(url, headers=self.headers, timeout=10)
-            
-            if response.status_code == 200:
-                with open(cache_file, 'wb') as f:
-                    f.write(response.content)
-                print(f"✓ Lot sizes cached: {cache_file}")
+            logger.info("Downloading lot sizes from NSE...")
+            with _NSE_GATE, self.session.get(url, headers=self.headers, stream=True, timeout=10) as response:
+                if response.status_code != 200:
+                    logger.warning("Failed to download lot sizes: Status %s", response.status_code)
+                    return None
                 
-                # Clean up old cache files (older than 7 days)
-                self._cleanup_old_cache()
-                
-                return cache_file
-            else:
-                print(f"⚠️  Failed to download lot sizes: Status {response.status_code}")
-                return None
+                # Stream straight to disk; raw bytes still need gzip decoding.
+                # Write to a temp file first so an interrupted download never
+                # leaves a truncated CSV behind under the real name
+                response.raw.decode_content = True
+                with open(tmp_file, 'wb') as f:
+                    shutil.copyfileobj(response.raw, f, length=64 * 1024)
+            
+            os.replace(tmp_file, cache_file)
+            logger.info("Lot sizes cached: %s", cache_file)
+            
+            # Clean up old cache files (older than 7 days)
+            self._cleanup_old_cache()
+            
+            return cache_file
                 
         except Exception as e:
-            print(f"⚠️  Error downloading lot sizes: {e}")
+            logger.warning("Error downloading lot sizes: %s", e)
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
             return None
     
     def _cleanup_old_cache(self):
@@ -172,19 +596,23 @@ class NSEDataFetcher:
         if not os.path.exists(self.cache_dir):
             return
         
-        cutoff_date = datetime.now() - timedelta(days=7)
+        cutoff_ts = time() - LOT_SIZES_MAX_AGE
         
-        for filename in os.listdir(self.cache_dir):
-            if filename.startswith('fo_mktlots_') and filename.endswith('.csv'):
-                filepath = os.path.join(self.cache_dir, filename)
-                file_time = datetime.fromtimestamp(os.path.getmtime(filepath))
-                
-                if file_time < cutoff_date:
-                    try:
-                        os.remove(filepath)
-                        print(f"✓ Cleaned old cache: {filename}")
-                    except Exception as e:
-                        print(f"⚠️  Could not remove old cache {filename}: {e}")
+        with os.scandir(self.cache_dir) as entries:
+            old_files = [
+                entry for entry in entries
+                if entry.name.startswith('fo_mktlots_') and entry.name.endswith('.csv')
+                and entry.stat().st_mtime < cutoff_ts
+            ]
+        
+        for entry in old_files:
+            try:
+                os.remove(entry.path)
+                if os.path.exists(entry.path + '.pkl'):
+                    os.remove(entry.path + '.pkl')
+                logger.info("Cleaned old cache: %s", entry.name)
+            except Exception as e:
+                logger.warning("Could not remove old cache %s: %s", entry.name, e)
     
     def _load_lot_sizes(self):
         """
@@ -201,25 +629,26 @@ class NSEDataFetcher:
         # Check for today's cache file
         today = datetime.now().strftime('%Y-%m-%d')
         cache_file = os.path.join(self.cache_dir, f'fo_mktlots_{today}.csv')
-        cutoff_date = datetime.now() - timedelta(days=7)
+        cutoff_ts = time() - LOT_SIZES_MAX_AGE
         
         # If today's cache doesn't exist, try to find a recent cache (< 7 days old)
         if not os.path.exists(cache_file):
             if os.path.exists(self.cache_dir):
                 cache_files = []
-                for f in os.listdir(self.cache_dir):
-                    if f.startswith('fo_mktlots_') and f.endswith('.csv'):
-                        filepath = os.path.join(self.cache_dir, f)
-                        file_time = datetime.fromtimestamp(os.path.getmtime(filepath))
-                        # Only consider files less than 7 days old
-                        if file_time >= cutoff_date:
-                            cache_files.append((f, file_time))
+                with os.scandir(self.cache_dir) as entries:
+                    for entry in entries:
+                        if entry.name.startswith('fo_mktlots_') and entry.name.endswith('.csv'):
+                            # DirEntry.stat() is cached, so no extra syscall per file
+                            file_ts = entry.stat().st_mtime
+                            # Only consider files less than 7 days old
+                            if file_ts >= cutoff_ts:
+                                cache_files.append((entry.name, file_ts))
                 
                 if cache_files:
                     # Use most recent valid cache file
-                    cache_files.sort(key=lambda x: x[1], reverse=True)
-                    cache_file = os.path.join(self.cache_dir, cache_files[0][0])
-                    print(f"Using cached lot sizes: {cache_files[0][0]}")
+                    newest = max(cache_files, key=lambda x: x[1])
+                    cache_file = os.path.join(self.cache_dir, newest[0])
+                    logger.info("Using cached lot sizes: %s", newest[0])
                 else:
                     # No valid cache exists, download new
                     cache_file = self._download_lot_sizes()
@@ -227,49 +656,31 @@ class NSEDataFetcher:
                 # Cache directory doesn't exist, download new
                 cache_file = self._download_lot_sizes()
         else:
-            print(f"Using today's cached lot sizes")
+            logger.info("Using today's cached lot sizes")
         
-        # Parse the CSV file
         lot_sizes = {}
         
         if cache_file and os.path.exists(cache_file):
-            try:
-                with open(cache_file, 'r') as f:
-                    reader = csv.reader(f)
-                    rows = list(reader)
-                    
-                    if len(rows) > 0:
-                        # First row is headers
-                        headers = [h.strip() for h in rows[0]]
-                        
-                        # Column 1 is SYMBOL, columns 2+ are month lot sizes
-                        symbol_col_idx = 1
-                        month_col_start = 2
-                        
-                        # Parse each row
-                        for row in rows[1:]:  # Skip header
-                            if len(row) > symbol_col_idx:
-                                symbol = row[symbol_col_idx].strip()
-                                
-                                # Skip empty or header-like rows
-                                if not symbol or symbol == 'Symbol':
-                                    continue
-                                
-                                # Find first non-empty lot size from month columns
-                                lot_size = None
-                                for col_idx in range(month_col_start, len(row)):
-                                    value = row[col_idx].strip()
-                                    if value and value.isdigit():
-                                        lot_size = int(value)
-                                        break  # Use first available month
-                                
-                                if lot_size:
-                                    lot_sizes[symbol] = lot_size
-                
-                print(f"✓ Loaded {len(lot_sizes)} lot sizes from cache")
+            parsed_file = cache_file + '.pkl'
+            
+            # Reuse lot sizes parsed on a previous start if they are up to date
+            if os.path.exists(parsed_file) and os.path.getmtime(parsed_file) >= os.path.getmtime(cache_file):
+                try:
+                    with open(parsed_file, 'rb') as f:
+                        lot_sizes = pickle.load(f)
+                    logger.info("Loaded %s lot sizes from cache", len(lot_sizes))
+                except Exception as e:
+                    logger.warning("Error reading parsed lot sizes: %s", e)
+            
+            if not lot_sizes:
+                lot_sizes = self._parse_lot_sizes_csv(cache_file)
                 
-            except Exception as e:
-                print(f"⚠️  Error parsing lot sizes CSV: {e}")
+                if lot_sizes:
+                    try:
+                        with open(parsed_file, 'wb') as f:
+                            pickle.dump(lot_sizes, f, protocol=5)
+                    except Exception as e:
+                        logger.warning("Could not save parsed lot sizes: %s", e)
         
         # If no lot sizes were loaded, raise an error
         if not lot_sizes:
@@ -282,6 +693,43 @@ class NSEDataFetcher:
         
         return lot_sizes
     
+    def _parse_lot_sizes_csv(self, cache_file):
+        """
+        Parse the NSE lot sizes CSV.
+        
+        Args:
+            cache_file (str): Path to the downloaded CSV
+            
+        Returns:
+            dict: {symbol: lot_size}, empty if the file could not be parsed
+        """
+        lot_sizes = {}
+        
+        try:
+            # Parse straight from a read-only memory map of the file
+            with open(cache_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                df = pd.read_csv(mm, dtype=str, skipinitialspace=True)
+            df = df.apply(lambda col: col.str.strip())
+            
+            # Column 1 is SYMBOL, columns 2+ are month lot sizes
+            symbols = df.iloc[:, 1]
+            months = df.iloc[:, 2:]
+            
+            # Use the first month column holding a plain number
+            digits = months.where(months.apply(lambda col: col.str.fullmatch(r'\d+', na=False)))
+            lot_size = pd.to_numeric(digits.bfill(axis=1).iloc[:, 0])
+            
+            # Skip empty or header-like rows and rows without a lot size
+            valid = symbols.notna() & (symbols != '') & (symbols != 'Symbol') & (lot_size > 0)
+            lot_sizes = dict(zip(symbols[valid], lot_size[valid].astype(int).tolist()))
+            
+            logger.info("Loaded %s lot sizes from cache", len(lot_sizes))
+            
+        except Exception as e:
+            logger.warning("Error parsing lot sizes CSV: %s", e)
+        
+        return lot_sizes
+    
     def get_lot_size(self, symbol):
         """
         Get lot size for a symbol from cached data.
@@ -6,11 +6,12 @@ Strategy 1: Short Straddle Analysis
 import streamlit as st
 import pandas as pd
 import json
+import logging
 import os
 from datetime import datetime
-from collections import defaultdict
-from time import sleep
-from nse_api import NSEDataFetcher
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+logger = logging.getLogger(__name__)
 
 # Page configuration
 st.set_page_config(
@@ -60,22 +61,77 @@ ALL_FO_STOCKS = [
     "TRENT", "TVSMOTOR", "UBL", "ULTRACEMCO", "UPL", "VEDL", "VOLTAS", "WIPRO", "ZEEL", "ZYDUSLIFE"
 ]
 
-MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+# Sorted once per server process; a module-level sort would still run on
+# every full rerun, since Streamlit re-executes this script each time
+@st.cache_resource
+def sorted_fo_stocks():
+    return tuple(sorted(ALL_FO_STOCKS))
+
+MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+# Auto-refresh interval in seconds. Cached NSE lookups expire a few seconds
+# earlier, so every refresh fetches fresh premiums
+REFRESH_INTERVAL = 30
+NSE_CACHE_TTL = REFRESH_INTERVAL - 5
+
+# Table formatting, built outside the analysis fragment so its timed reruns reuse it
+STRADDLE_COLUMN_CONFIG = {
+    "Symbol": st.column_config.TextColumn("Symbol", width="small"),
+    "Current": st.column_config.NumberColumn("Current", format="₹ %.2f"),
+    "Strike": st.column_config.NumberColumn("Strike", format="₹ %.2f"),
+    "CALL": st.column_config.NumberColumn("CALL", format="₹ %.2f"),
+    "PUT": st.column_config.NumberColumn("PUT", format="₹ %.2f"),
+    "C+P": st.column_config.NumberColumn("C+P", format="₹ %.2f"),
+    "Investment": st.column_config.NumberColumn("Investment", format="₹ %d"),
+    "MAX Profit": st.column_config.NumberColumn("MAX Profit", format="₹%d"),
+    "MAX ROI %": st.column_config.NumberColumn("MAX ROI %", format="%.2f%%"),
+    "Short Safety": st.column_config.NumberColumn("Short Safety", format="₹ %.2f"),
+    "Long Safety": st.column_config.NumberColumn("Long Safety", format="₹ %.2f"),
+}
+
+# "Investment" is added per render since its help text depends on the margin
+COVERED_CALL_COLUMN_CONFIG = {
+    "Symbol": st.column_config.TextColumn("Symbol", width="small"),
+    "Expiry": st.column_config.TextColumn("Expiry", width="small"),
+    "Current": st.column_config.NumberColumn("Current", format="₹ %.2f"),
+    "Strike": st.column_config.NumberColumn("Strike", format="₹ %.2f"),
+    "Safety Point": st.column_config.NumberColumn("Safety Point", format="₹ %.2f"),
+    "Safety %": st.column_config.NumberColumn("Safety %", format="%.2f%%"),
+    "CALL": st.column_config.NumberColumn("CALL", format="₹ %.2f"),
+    "MAX Profit": st.column_config.NumberColumn("MAX Profit", format="₹ %d"),
+    "MAX ROI %": st.column_config.NumberColumn("MAX ROI %", format="%.2f%%"),
+    "CALL Vol": st.column_config.NumberColumn("CALL Vol", format="%d"),
+}
+
+# Results keep full-precision floats; the "%.2f" formats above round them for
+# display. Integer columns are sent to the browser as int32 to shrink the payload
+STRADDLE_INT_COLUMNS = {'Investment': 'int32', 'MAX Profit': 'int32', 'CALL Vol': 'int32', 'PUT Vol': 'int32'}
+COVERED_CALL_INT_COLUMNS = {'Investment': 'int32', 'MAX Profit': 'int32', 'CALL Vol': 'int32'}
+
+# Read from disk once per server process and shared across sessions (read-only).
+# Errors are raised rather than cached, so the next session retries the read
+@st.cache_resource
+def read_preferences():
+    """Read preferences from JSON file"""
+    with open(PREFERENCES_FILE, 'r') as f:
+        return json.load(f)
 
 def load_preferences():
-    """Load preferences from JSON file"""
+    """Load preferences, falling back to the defaults"""
     if os.path.exists(PREFERENCES_FILE):
         try:
-            with open(PREFERENCES_FILE, 'r') as f:
-                return json.load(f)
-        except:
-            return DEFAULT_PREFERENCES.copy()
+            return read_preferences()
+        except (OSError, json.JSONDecodeError) as e:
+            st.warning(f"⚠️ Could not load preferences, using defaults: {e}")
     return DEFAULT_PREFERENCES.copy()
 
 def save_preferences(prefs):
-    """Save preferences to JSON file"""
-    with open(PREFERENCES_FILE, 'w') as f:
+    """Save preferences to JSON file (atomically, so a crash never leaves a partial file)"""
+    tmp_file = PREFERENCES_FILE + ".tmp"
+    with open(tmp_file, 'w') as f:
         json.dump(prefs, f, indent=2)
+    os.replace(tmp_file, PREFERENCES_FILE)
+    read_preferences.clear()
 
 # Load preferences
 if 'preferences' not in st.session_state:
@@ -84,7 +140,141 @@ if 'preferences' not in st.session_state:
 # Initialize NSE fetcher (cached)
 @st.cache_resource
 def get_fetcher():
-    return NSEDataFetcher()
+    # Imported here so the fetcher and its HTTP stack load once per process, not per rerun
+    from nse_api import NSEDataFetcher, build_session
+    
+    # One pooled session per server process, so reruns reuse open connections
+    fetcher = NSEDataFetcher(session=build_session(pool_size=50))
+    
+    # Collect NSE cookies now rather than on the first symbol's request
+    fetcher.warm_up()
+    return fetcher
+
+# Thread pool for per-stock NSE fetches (cached so threads survive reruns)
+@st.cache_resource
+def get_executor():
+    return ThreadPoolExecutor(max_workers=8)
+
+# Cached NSE lookups: the ATM range and margin are applied after fetching,
+# so tweaking them reuses the last response instead of hitting NSE again
+@st.cache_data(ttl=NSE_CACHE_TTL, show_spinner=False)
+def cached_price(symbol):
+    return get_fetcher().get_stock_price(symbol)
+
+@st.cache_data(ttl=NSE_CACHE_TTL, show_spinner=False)
+def cached_lot_size(symbol):
+    return get_fetcher().get_lot_size(symbol)
+
+@st.cache_data(ttl=NSE_CACHE_TTL, show_spinner=False)
+def cached_options(symbol, month):
+    return get_fetcher().get_options_data(symbol, expiry_month=month)
+
+def short_expiry(expiry_dates):
+    """Trim expiry dates like '26-Dec-2024' to '26-Dec' in one vectorized pass"""
+    return expiry_dates.str.extract(r'^([^-]*(?:-[^-]*)?)', expand=False).fillna('')
+
+def fetch_symbol(symbol, months, atm_lower, atm_upper, margin):
+    """
+    Find short straddle and covered call opportunities for one stock
+    from a single pass over each month's option chain.
+    
+    Returns:
+        tuple: (straddle DataFrames, covered call DataFrames), one per month with results
+    """
+    straddles = []
+    covered_calls = []
+    
+    # Get current price and options
+    current_price = cached_price(symbol)
+    lot_size = cached_lot_size(symbol)
+    
+    if current_price == 0:
+        # A failed fetch: drop it so the next run retries instead of reusing it
+        cached_price.clear(symbol)
+        return straddles, covered_calls
+    
+    # Investment and holding cost are the same for every strike of a stock
+    straddle_investment = margin * 2 * lot_size * current_price
+    call_investment = int(margin * lot_size * current_price)
+    interest = round(0.01 * margin * lot_size * current_price, 2)  # Holding cost
+    
+    # Strike bounds: ATM range for straddles, at or above current price for calls
+    atm_lo = atm_lower * current_price
+    atm_hi = atm_upper * current_price
+    call_lo = 0.999 * current_price
+    
+    # Get options for chosen months
+    for month in months:
+        options = cached_options(symbol, month)
+        
+        # Skip options with a zero premium
+        options = options[options['last_price'] > 0]
+        
+        # Nothing listed (or nothing traded) for this month
+        if options.empty:
+            continue
+        
+        # Straddle: pair CALL (CE) and PUT (PE) within ATM range by strike
+        in_range = options[options['strike'].between(atm_lo, atm_hi)]
+        legs = in_range[['strike', 'option_type', 'last_price', 'volume', 'expiry_date']]
+        ce = legs[legs['option_type'] == 'CE'].drop_duplicates('strike', keep='last').set_index('strike')
+        pe = legs[legs['option_type'] == 'PE'].drop_duplicates('strike', keep='last').set_index('strike')
+        
+        # Inner join keeps only strikes with both a CALL and a PUT
+        pairs = ce.join(pe, how='inner', lsuffix='_ce', rsuffix='_pe')
+        
+        call_premium = pairs['last_price_ce']
+        put_premium = pairs['last_price_pe']
+        combined_premium = call_premium + put_premium
+        max_profit = combined_premium * lot_size
+        strike = pairs.index.to_series()
+        
+        straddle = pd.DataFrame({
+            'Symbol': symbol,
+            'Current': current_price,
+            'Strike': strike,
+            'Expiry': short_expiry(pairs['expiry_date_ce']),
+            'CALL': call_premium,
+            'PUT': put_premium,
+            'C+P': combined_premium,
+            'Investment': straddle_investment,
+            'MAX Profit': max_profit,
+            'MAX ROI %': max_profit / straddle_investment * 100,
+            'Short Safety': strike - combined_premium,
+            'Long Safety': strike + combined_premium,
+            'CALL Vol': pairs['volume_ce'],
+            'PUT Vol': pairs['volume_pe']
+        })
+        if not straddle.empty:
+            straddles.append(straddle)
+        
+        # Covered call: only CALL strikes at or above current price (OTM/ATM calls)
+        calls = options[
+            (options['option_type'] == 'CE')
+            & options['strike'].between(call_lo, atm_hi)
+        ]
+        
+        # Max Profit: if stock rises to strike + premium collected - interest
+        gain = (calls['strike'] - current_price + calls['last_price']) * lot_size - interest
+        
+        covered_call = pd.DataFrame({
+            'Symbol': symbol,
+            'Current': current_price,
+            'Strike': calls['strike'],
+            'Expiry': short_expiry(calls['expiry_date']),
+            'CALL': calls['last_price'],
+            'Investment': call_investment,
+            'MAX Profit': gain,
+            'MAX ROI %': 100 * gain / call_investment,
+            # Safety Point: price at which you break even
+            'Safety Point': 1.003 * current_price - calls['last_price'],
+            'Safety %': (calls['last_price'] - 0.003 * current_price) / current_price * 100,
+            'CALL Vol': calls['volume']
+        })
+        if not covered_call.empty:
+            covered_calls.append(covered_call)
+    
+    return straddles, covered_calls
 
 # Sidebar configuration
 st.sidebar.title("⚙️ Configuration")
@@ -92,7 +282,7 @@ st.sidebar.title("⚙️ Configuration")
 # Stock selection
 selected_stocks = st.sidebar.multiselect(
     "Select Stocks",
-    options=sorted(ALL_FO_STOCKS),
+    options=sorted_fo_stocks(),
     default=st.session_state.preferences.get("stock_list", DEFAULT_PREFERENCES["stock_list"]),
     help="Choose one or more stocks to analyze"
 )
@@ -149,9 +339,9 @@ sort_by = st.sidebar.selectbox(
 
 # Auto-refresh toggle
 auto_refresh = st.sidebar.checkbox(
-    "Auto-refresh (30s)",
+    f"Auto-refresh ({REFRESH_INTERVAL}s)",
     value=st.session_state.preferences.get("auto_refresh", True),
-    help="Automatically refresh data every 30 seconds"
+    help=f"Automatically refresh data every {REFRESH_INTERVAL} seconds"
 )
 
 # Save preferences button here
@@ -172,323 +362,171 @@ if st.sidebar.button("💾 Save Preferences"):
 # Main content
 st.title("📈 NSE Options Trading Analysis")
 
-# Info section
-col1, col2, col3, col4 = st.columns(4)
-with col1:
-    st.metric("Stocks", len(selected_stocks))
-with col2:
-    st.metric("Months", len(selected_months))
-with col3:
-    st.metric("ATM Range", f"{atm_lower*100:.0f}%-{atm_upper*100:.0f}%")
-with col4:
-    st.metric("Last Update", datetime.now().strftime('%H:%M:%S'))
-
-st.divider()
-
-st.subheader("Strategy 1: Short Straddle")
-st.markdown("Sell a CALL and a PUT at the same strike price.")
-st.markdown("Ideal for Low Volatility.")
-
-# Validation
-if not selected_stocks:
-    st.warning("⚠️ Please select at least one stock from the sidebar.")
-    st.stop()
-
-if not selected_months:
-    st.warning("⚠️ Please select at least one expiry month from the sidebar.")
-    st.stop()
-
-# Placeholder for data
-data_placeholder = st.empty()
-status_placeholder = st.empty()
-
-# Fetch and display data
-try:
-    fetcher = get_fetcher()
+# Analysis section reruns on its own every REFRESH_INTERVAL seconds when
+# auto-refresh is on, without rerunning the sidebar
+@st.fragment(run_every=REFRESH_INTERVAL if auto_refresh else None)
+def render_analysis(selected_stocks, selected_months, atm_lower, atm_upper, margin, sort_by):
+    # Info section
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Stocks", len(selected_stocks))
+    with col2:
+        st.metric("Months", len(selected_months))
+    with col3:
+        st.metric("ATM Range", f"{atm_lower*100:.0f}%-{atm_upper*100:.0f}%")
+    with col4:
+        st.metric("Last Update", datetime.now().strftime('%H:%M:%S'))
+
+    st.divider()
+
+    st.subheader("Strategy 1: Short Straddle")
+    st.markdown("Sell a CALL and a PUT at the same strike price.")
+    st.markdown("Ideal for Low Volatility.")
+
+    # Validation
+    if not selected_stocks:
+        st.warning("⚠️ Please select at least one stock from the sidebar.")
+        return
+
+    if not selected_months:
+        st.warning("⚠️ Please select at least one expiry month from the sidebar.")
+        return
+
+    # Placeholder for data
+    data_placeholder = st.empty()
+    status_placeholder = st.empty()
+
+    # Fetch data for both strategies in a single pass
     all_opportunities = []
-    
+    all_opportunities2 = []
+    fetch_error = None
+
     # Progress bar
     progress_bar = st.progress(0)
     status_text = st.empty()
-    
-    # Fetch data for each stock
-    for idx, symbol in enumerate(selected_stocks):
-        status_text.text(f"Processing {symbol}... ({idx+1}/{len(selected_stocks)})")
-        progress_bar.progress((idx + 1) / len(selected_stocks))
+
+    try:
+        # Create the fetcher up front so start-up errors surface here
+        get_fetcher()
         
-        try:
-            # Get current price and options
-            current_price = fetcher.get_stock_price(symbol)
-            lot_size = fetcher.get_lot_size(symbol)
+        # Fetch data for all stocks in parallel
+        futures = {
+            get_executor().submit(fetch_symbol, symbol, selected_months, atm_lower, atm_upper, margin): symbol
+            for symbol in selected_stocks
+        }
+        
+        for done, future in enumerate(as_completed(futures), start=1):
+            symbol = futures[future]
+            status_text.text(f"Processed {symbol}... ({done}/{len(selected_stocks)})")
+            progress_bar.progress(done / len(selected_stocks))
             
-            if current_price == 0:
-                continue
+            try:
+                straddles, covered_calls = future.result()
+                all_opportunities.extend(straddles)
+                all_opportunities2.extend(covered_calls)
+            # Expected per-stock failures: network errors and timeouts (OSError),
+            # unknown lot size (ValueError) or a malformed response (KeyError).
+            # Anything else is a bug and is left to propagate.
+            except (OSError, KeyError, ValueError) as e:
+                logger.warning("Error processing %s", symbol, exc_info=True)
+                status_placeholder.warning(f"⚠️ Error processing {symbol}: {e}")
+
+    # Unexpected errors stop the scan, but the stocks already collected are
+    # still shown below
+    except Exception as e:
+        fetch_error = e
+        logger.exception("Scan stopped by an unexpected error")
+        st.error(f"❌ Error: {e}")
+
+    finally:
+        # Clear progress indicators
+        progress_bar.empty()
+        status_text.empty()
+
+    # Display Strategy 1 results
+    try:
+        if all_opportunities:
+            df = pd.concat(all_opportunities, ignore_index=True)
             
-            # Get options for chosen months
-            for month in selected_months:
-                options = fetcher.get_options_data(symbol, expiry_month=month)
-                
-                # Group options by strike price
-                strikes = defaultdict(lambda: {'CE': None, 'PE': None})
-                
-                for opt in options:
-                    strike = opt['strike']
-                    opt_type = opt['option_type']
-                    
-                    # Only consider strikes within ATM range
-                    if (atm_lower * current_price) <= strike <= (atm_upper * current_price):
-                        strikes[strike][opt_type] = opt
-                
-                # Find strikes with both CALL (CE) and PUT (PE)
-                for strike, options_pair in strikes.items():
-                    ce_opt = options_pair['CE']
-                    pe_opt = options_pair['PE']
-                    
-                    # Skip if either option is missing
-                    if not ce_opt or not pe_opt:
-                        continue
-                    
-                    # Extract data
-                    call_premium = ce_opt['last_price']
-                    put_premium = pe_opt['last_price']
-                    call_volume = ce_opt['volume']
-                    put_volume = pe_opt['volume']
-                    expiry_full = ce_opt['expiry_date']
-                    
-                    # Format expiry date
-                    expiry = '-'.join(expiry_full.split('-')[:2]) if expiry_full else ''
-                    
-                    # Skip if premiums are zero
-                    if call_premium == 0 or put_premium == 0:
-                        continue
-                    
-                    # Calculate metrics
-                    combined_premium = call_premium + put_premium
-                    investment = margin * 2 * lot_size * current_price
-                    max_profit = combined_premium * lot_size
-                    max_roi = (max_profit / investment) * 100
-                    
-                    # Safety ranges
-                    short_safety = strike - combined_premium
-                    long_safety = strike + combined_premium
-                    
-                    all_opportunities.append({
-                        'Symbol': symbol,
-                        'Current': current_price,
-                        'Strike': strike,
-                        'Expiry': expiry,
-                        'CALL': call_premium,
-                        'PUT': put_premium,
-                        'C+P': round(combined_premium, 2),
-                        'Investment': int(investment),
-                        'MAX Profit': int(max_profit),
-                        'MAX ROI %': round(max_roi, 2),
-                        'Short Safety': round(short_safety, 2),
-                        'Long Safety': round(long_safety, 2),
-                        'CALL Vol': call_volume,
-                        'PUT Vol': put_volume
-                    })
-        
-        except Exception as e:
-            status_placeholder.warning(f"⚠️ Error processing {symbol}: {e}")
-    
-    # Clear progress indicators
-    progress_bar.empty()
-    status_text.empty()
-    
-    # Display results
-    if all_opportunities:
-        df = pd.DataFrame(all_opportunities)
-        
-        # Sort by ROI or normal
-        if sort_by == 'ROI':
-            df = df.sort_values('MAX ROI %', ascending=False)
-        else:
-            df = df.sort_values(['Symbol', 'Strike'])
-        
-        df = df.reset_index(drop=True)
-        
-        # Display dataframe with formatting
-        st.success(f"✓ Found {len(df)} opportunities")
-        
-        # Format dataframe for display
-        st.dataframe(
-            df,
-            use_container_width=True,
-            hide_index=False,
-            column_config={
-                "Symbol": st.column_config.TextColumn("Symbol", width="small"),
-                "Current": st.column_config.NumberColumn("Current", format="₹ %.2f"),
-                "Strike": st.column_config.NumberColumn("Strike", format="₹ %.2f"),
-                "CALL": st.column_config.NumberColumn("CALL", format="₹ %.2f"),
-                "PUT": st.column_config.NumberColumn("PUT", format="₹ %.2f"),
-                "C+P": st.column_config.NumberColumn("C+P", format="₹ %.2f"),
-                "Investment": st.column_config.NumberColumn("Investment", format="₹ %d"),
-                "MAX Profit": st.column_config.NumberColumn("MAX Profit", format="₹%d"),
-                "MAX ROI %": st.column_config.NumberColumn("MAX ROI %", format="%.2f%%"),
-                "Short Safety": st.column_config.NumberColumn("Short Safety", format="₹ %.2f"),
-                "Long Safety": st.column_config.NumberColumn("Long Safety", format="₹ %.2f"),
-            }
-        )
-        
-        # Summary statistics
-        st.subheader("📊 Summary")
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.metric("Avg ROI", f"{df['MAX ROI %'].mean():.2f}%")
-        with col2:
-            st.metric("Max ROI", f"{df['MAX ROI %'].max():.2f}%")
-        with col3:
-            st.metric("Avg Investment", f"₹{df['Investment'].mean():,.0f}")
-    
-    else:
-        st.warning("⚠️ No opportunities found. Market may be closed or no suitable strikes available.")
-
-except Exception as e:
-    st.error(f"❌ Error: {e}")
-
-# Strategy 2: Covered Call
-st.divider()
-st.subheader("Strategy 2: Covered Call")
-st.markdown("Sell a CALL option while holding the underlying stock (i.e. buy the underlying stock).")
-st.markdown("Ideal for Moderate Bullish Outlook.")
-
-# Placeholder for Strategy 2 data
-data_placeholder2 = st.empty()
-status_placeholder2 = st.empty()
-
-# Fetch and display Strategy 2 data
-try:
-    fetcher2 = get_fetcher()
-    all_opportunities2 = []
-    
-    # Progress bar
-    progress_bar2 = st.progress(0)
-    status_text2 = st.empty()
-    
-    # Fetch data for each stock
-    for idx, symbol in enumerate(selected_stocks):
-        status_text2.text(f"Processing {symbol} for Covered Call... ({idx+1}/{len(selected_stocks)})")
-        progress_bar2.progress((idx + 1) / len(selected_stocks))
-        
-        try:
-            # Get current price and options
-            current_price = fetcher2.get_stock_price(symbol)
-            lot_size = fetcher2.get_lot_size(symbol)
+            # Sort by ROI or normal
+            if sort_by == 'ROI':
+                df = df.sort_values('MAX ROI %', ascending=False)
+            else:
+                df = df.sort_values(['Symbol', 'Strike'])
             
-            if current_price == 0:
-                continue
+            df = df.reset_index(drop=True).astype(STRADDLE_INT_COLUMNS)
             
-            # Get options for chosen months
-            for month in selected_months:
-                options = fetcher2.get_options_data(symbol, expiry_month=month)
-                
-                # Only look at CALL options
-                for opt in options:
-                    if opt['option_type'] != 'CE':
-                        continue
-                    
-                    strike = opt['strike']
-                    
-                    # Only consider strikes at or above current price (OTM/ATM calls)
-                    if not (0.999 * current_price <= strike <= atm_upper * current_price):
-                        continue
-                    
-                    # Extract data
-                    call_premium = opt['last_price']
-                    call_volume = opt['volume']
-                    expiry_full = opt['expiry_date']
-                    
-                    # Format expiry date
-                    expiry = '-'.join(expiry_full.split('-')[:2]) if expiry_full else ''
-                    
-                    # Skip if premium is zero
-                    if call_premium == 0:
-                        continue
-                    
-                    # Calculate metrics for covered call
-                    # Investment = stock purchase cost (with margin)
-                    investment = int(margin * lot_size * current_price)
-                    interest = round(0.01 * margin * lot_size * current_price, 2)  # Holding cost
-                    
-                    # Max Profit: if stock rises to strike + premium collected - interest
-                    max_profit = int(((strike - current_price + call_premium) * lot_size) - interest)
-                    max_roi = round(100 * (((strike - current_price + call_premium) * lot_size) - interest) / investment, 2)
-                    
-                    # Safety Point: price at which you break even
-                    safety_point = round((1.003 * current_price) - call_premium, 2)
-                    safety_pct = round(((call_premium - (0.003 * current_price)) / current_price * 100), 2)
-                    
-                    all_opportunities2.append({
-                        'Symbol': symbol,
-                        'Current': current_price,
-                        'Strike': strike,
-                        'Expiry': expiry,
-                        'CALL': call_premium,
-                        'Investment': investment,
-                        'MAX Profit': max_profit,
-                        'MAX ROI %': max_roi,
-                        'Safety Point': safety_point,
-                        'Safety %': safety_pct,
-                        'CALL Vol': call_volume
-                    })
-        
-        except Exception as e:
-            status_placeholder2.warning(f"⚠️ Error processing {symbol}: {e}")
-    
-    # Clear progress indicators
-    progress_bar2.empty()
-    status_text2.empty()
-    
-    # Display results
-    if all_opportunities2:
-        df2 = pd.DataFrame(all_opportunities2)
-        
-        # Sort by ROI
-        df2 = df2.sort_values('MAX ROI %', ascending=False)
-        df2 = df2.reset_index(drop=True)
-        
-        # Display dataframe with formatting
-        st.success(f"✓ Found {len(df2)} covered call opportunities")
+            # Display dataframe with formatting
+            st.success(f"✓ Found {len(df)} opportunities")
+            
+            # Format dataframe for display
+            st.dataframe(
+                df,
+                use_container_width=True,
+                hide_index=False,
+                column_config=STRADDLE_COLUMN_CONFIG
+            )
+            
+            # Summary statistics
+            st.subheader("📊 Summary")
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Avg ROI", f"{df['MAX ROI %'].mean():.2f}%")
+            with col2:
+                st.metric("Max ROI", f"{df['MAX ROI %'].max():.2f}%")
+            with col3:
+                st.metric("Avg Investment", f"₹{df['Investment'].mean():,.0f}")
         
-        # Format dataframe for display
-        st.dataframe(
-            df2,
-            use_container_width=True,
-            hide_index=False,
-            column_config={
-                "Symbol": st.column_config.TextColumn("Symbol", width="small"),
-                "Expiry": st.column_config.TextColumn("Expiry", width="small"),
-                "Current": st.column_config.NumberColumn("Current", format="₹ %.2f"),
-                "Strike": st.column_config.NumberColumn("Strike", format="₹ %.2f"),
-                "Safety Point": st.column_config.NumberColumn("Safety Point", format="₹ %.2f"),
-                "Safety %": st.column_config.NumberColumn("Safety %", format="%.2f%%"),
-                "CALL": st.column_config.NumberColumn("CALL", format="₹ %.2f"),
-                "Investment": st.column_config.NumberColumn("Investment", format="₹ %d", help=f"This includes a margin of {margin*100:.0f}% and the interest"),
-                "MAX Profit": st.column_config.NumberColumn("MAX Profit", format="₹ %d"),
-                "MAX ROI %": st.column_config.NumberColumn("MAX ROI %", format="%.2f%%"),
-                "CALL Vol": st.column_config.NumberColumn("CALL Vol", format="%d"),
-            }
-        )
+        elif fetch_error is None:
+            st.warning("⚠️ No opportunities found. Market may be closed or no suitable strikes available.")
+
+    except Exception as e:
+        st.error(f"❌ Error: {e}")
+
+    # Strategy 2: Covered Call
+    st.divider()
+    st.subheader("Strategy 2: Covered Call")
+    st.markdown("Sell a CALL option while holding the underlying stock (i.e. buy the underlying stock).")
+    st.markdown("Ideal for Moderate Bullish Outlook.")
+
+    # Display Strategy 2 results
+    try:
+        if all_opportunities2:
+            df2 = pd.concat(all_opportunities2, ignore_index=True)
+            
+            # Sort by ROI
+            df2 = df2.sort_values('MAX ROI %', ascending=False)
+            df2 = df2.reset_index(drop=True).astype(COVERED_CALL_INT_COLUMNS)
+            
+            # Display dataframe with formatting
+            st.success(f"✓ Found {len(df2)} covered call opportunities")
+            
+            # Format dataframe for display
+            st.dataframe(
+                df2,
+                use_container_width=True,
+                hide_index=False,
+                column_config={
+                    **COVERED_CALL_COLUMN_CONFIG,
+                    "Investment": st.column_config.NumberColumn("Investment", format="₹ %d", help=f"This includes a margin of {margin*100:.0f}% and the interest"),
+                }
+            )
+            
+            # Summary statistics
+            st.divider()
+            st.subheader("📊 Summary")
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Avg ROI", f"{df2['MAX ROI %'].mean():.2f}%")
+            with col2:
+                st.metric("Max ROI", f"{df2['MAX ROI %'].max():.2f}%")
+            with col3:
+                st.metric("Avg Investment", f"₹{df2['Investment'].mean():,.0f}")
         
-        # Summary statistics
-        st.divider()
-        st.subheader("📊 Summary")
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.metric("Avg ROI", f"{df2['MAX ROI %'].mean():.2f}%")
-        with col2:
-            st.metric("Max ROI", f"{df2['MAX ROI %'].max():.2f}%")
-        with col3:
-            st.metric("Avg Investment", f"₹{df2['Investment'].mean():,.0f}")
-    
-    else:
-        st.warning("⚠️ No covered call opportunities found.")
+        elif fetch_error is None:
+            st.warning("⚠️ No covered call opportunities found.")
 
-except Exception as e:
-    st.error(f"❌ Error: {e}")
+    except Exception as e:
+        st.error(f"❌ Error: {e}")
 
-# Auto-refresh logic
-if auto_refresh:
-    sleep(30)
-    st.rerun()
+render_analysis(selected_stocks, selected_months, atm_lower, atm_upper, margin, sort_by)